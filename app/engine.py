@@ -1,14 +1,454 @@
-from typing import Dict, Any, Optional, List
-from datetime import datetime
+from typing import Dict, Any, Optional, List, Callable
+from functools import lru_cache
+from types import CodeType
+import ast
 import asyncio
 import copy
+import operator
+import time
 
 from app.models import (
-    GraphDefinition, Node, NodeType, ExecutionLog
+    GraphDefinition, Node, NodeType, ExecutionLog, ExecutionLogList
 )
 from app.tools import tool_registry
 
 
+# Restricted globals for condition evaluation, built once instead of per call
+_SAFE_GLOBALS: Dict[str, Any] = {
+    '__builtins__': {},  # Restrict built-ins for safety
+    'len': len,
+    'int': int,
+    'float': float,
+    'str': str,
+    'bool': bool,
+    'True': True,
+    'False': False,
+    'None': None
+}
+
+
+# Lower bound on node executions per run before execute_graph gives up
+_MIN_MAX_STEPS = 100
+
+
+@lru_cache(maxsize=512)
+def _compile_cond(src: str) -> CodeType:
+    """Compile a condition string once and reuse the code object."""
+    return compile(src, "<cond>", "eval")
+
+
+def _eval_predicate(condition: str) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Build a predicate that evaluates a condition string with restricted eval.
+    
+    Errors are reported and treated as False, both for conditions that do
+    not compile and for ones that fail at evaluation time.
+    """
+    try:
+        code = _compile_cond(condition)
+    except SyntaxError as e:
+        error = e
+        
+        def predicate(state: Dict[str, Any]) -> bool:
+            print(f"Condition evaluation error: {error}")
+            return False
+        return predicate
+    
+    def predicate(state: Dict[str, Any]) -> bool:
+        try:
+            # state must be a global so comprehensions in the condition see it
+            return bool(eval(code, {**_SAFE_GLOBALS, 'state': state}))
+        except Exception as e:
+            print(f"Condition evaluation error: {e}")
+            return False
+    return predicate
+
+
+# Operators and calls understood by compile_predicate
+_COMPARE_OPS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Eq: operator.eq,
+    ast.NotEq: operator.ne,
+    ast.Lt: operator.lt,
+    ast.LtE: operator.le,
+    ast.Gt: operator.gt,
+    ast.GtE: operator.ge,
+    ast.Is: operator.is_,
+    ast.IsNot: operator.is_not,
+    ast.In: lambda a, b: a in b,
+    ast.NotIn: lambda a, b: a not in b
+}
+_BIN_OPS: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.FloorDiv: operator.floordiv,
+    ast.Mod: operator.mod
+}
+_UNARY_OPS: Dict[type, Callable[[Any], Any]] = {
+    ast.Not: operator.not_,
+    ast.USub: operator.neg,
+    ast.UAdd: operator.pos
+}
+_SAFE_CALLS: Dict[str, Callable] = {
+    name: _SAFE_GLOBALS[name] for name in ('len', 'int', 'float', 'str', 'bool')
+}
+
+
+class _UnsupportedCondition(Exception):
+    """Raised for condition syntax that compile_predicate does not handle."""
+
+
+def _state_lookup(node: ast.AST) -> Optional[tuple]:
+    """Recognize state['key'] and state.get('key'[, default]) with constant arguments."""
+    if (isinstance(node, ast.Subscript) and isinstance(node.value, ast.Name)
+            and node.value.id == 'state' and isinstance(node.slice, ast.Constant)):
+        return ('item', node.slice.value)
+    if (isinstance(node, ast.Call) and not node.keywords
+            and isinstance(node.func, ast.Attribute) and node.func.attr == 'get'
+            and isinstance(node.func.value, ast.Name) and node.func.value.id == 'state'
+            and 1 <= len(node.args) <= 2
+            and all(isinstance(arg, ast.Constant) for arg in node.args)):
+        return ('get',) + tuple(arg.value for arg in node.args)
+    return None
+
+
+def _build_expr(node: ast.AST) -> Callable[[Dict[str, Any]], Any]:
+    """Turn a condition expression node into a closure over the state."""
+    if isinstance(node, ast.Constant):
+        value = node.value
+        return lambda state: value
+    
+    if isinstance(node, ast.Name) and node.id == 'state':
+        return lambda state: state
+    
+    if isinstance(node, (ast.List, ast.Tuple)):
+        items = [_build_expr(item) for item in node.elts]
+        container_type = list if isinstance(node, ast.List) else tuple
+        return lambda state: container_type(item(state) for item in items)
+    
+    if isinstance(node, ast.Subscript):
+        container = _build_expr(node.value)
+        if isinstance(node.slice, ast.Constant):
+            key = node.slice.value
+            return lambda state: container(state)[key]
+        key_fn = _build_expr(node.slice)
+        return lambda state: container(state)[key_fn(state)]
+    
+    if isinstance(node, ast.Call) and not node.keywords:
+        func = node.func
+        args = [_build_expr(arg) for arg in node.args]
+        
+        # state.get(key[, default]), the most common form
+        if isinstance(func, ast.Attribute) and func.attr == 'get' and 1 <= len(args) <= 2:
+            lookup = _state_lookup(node)
+            if lookup:
+                get_args = lookup[1:]
+                return lambda state: state.get(*get_args)
+            target = _build_expr(func.value)
+            return lambda state: target(state).get(*[arg(state) for arg in args])
+        
+        if isinstance(func, ast.Name) and func.id in _SAFE_CALLS:
+            call = _SAFE_CALLS[func.id]
+            return lambda state: call(*[arg(state) for arg in args])
+    
+    if isinstance(node, ast.Compare):
+        left = _build_expr(node.left)
+        pairs = [
+            (_COMPARE_OPS[type(op)], _build_expr(comparator))
+            for op, comparator in zip(node.ops, node.comparators)
+            if type(op) in _COMPARE_OPS
+        ]
+        if len(pairs) != len(node.ops):
+            raise _UnsupportedCondition(ast.dump(node))
+        
+        if len(pairs) == 1:
+            op, right = pairs[0]
+            if isinstance(node.comparators[0], ast.Constant):
+                # Fuse the common "lookup <op> constant" into a single closure
+                value = node.comparators[0].value
+                lookup = _state_lookup(node.left)
+                if lookup and lookup[0] == 'item':
+                    key = lookup[1]
+                    return lambda state: op(state[key], value)
+                if lookup and len(lookup) == 3:
+                    key, default = lookup[1:]
+                    return lambda state: op(state.get(key, default), value)
+                if lookup:
+                    key = lookup[1]
+                    return lambda state: op(state.get(key), value)
+                return lambda state: op(left(state), value)
+            return lambda state: op(left(state), right(state))
+        
+        def compare_chain(state: Dict[str, Any]) -> bool:
+            left_value = left(state)
+            for op, right in pairs:
+                right_value = right(state)
+                if not op(left_value, right_value):
+                    return False
+                left_value = right_value
+            return True
+        return compare_chain
+    
+    if isinstance(node, ast.BoolOp):
+        operands = [_build_expr(value) for value in node.values]
+        # Same short-circuit and return-value semantics as Python's and/or
+        if len(operands) == 2:
+            first, second = operands
+            if isinstance(node.op, ast.And):
+                return lambda state: first(state) and second(state)
+            return lambda state: first(state) or second(state)
+        
+        if isinstance(node.op, ast.And):
+            def all_of(state: Dict[str, Any]) -> Any:
+                for operand in operands:
+                    result = operand(state)
+                    if not result:
+                        return result
+                return result
+            return all_of
+        
+        def any_of(state: Dict[str, Any]) -> Any:
+            for operand in operands:
+                result = operand(state)
+                if result:
+                    return result
+            return result
+        return any_of
+    
+    if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY_OPS:
+        unary_op = _UNARY_OPS[type(node.op)]
+        operand = _build_expr(node.operand)
+        return lambda state: unary_op(operand(state))
+    
+    if isinstance(node, ast.BinOp) and type(node.op) in _BIN_OPS:
+        bin_op = _BIN_OPS[type(node.op)]
+        left, right = _build_expr(node.left), _build_expr(node.right)
+        return lambda state: bin_op(left(state), right(state))
+    
+    raise _UnsupportedCondition(ast.dump(node))
+
+
+@lru_cache(maxsize=512)
+def compile_predicate(condition: str) -> Callable[[Dict[str, Any]], bool]:
+    """
+    Compile a condition string into a predicate over the state.
+    
+    Conditions built from state lookups (subscripts and state.get), constants,
+    comparisons, boolean and arithmetic operators and the safe built-ins are
+    turned into plain closures, so no bytecode runs through eval. Anything
+    else falls back to restricted eval.
+    
+    Examples:
+        "state['quality_score'] >= 70"
+        "state.get('num_issues', 0) < 3"
+    """
+    try:
+        expr = _build_expr(ast.parse(condition, mode="eval").body)
+    except (SyntaxError, _UnsupportedCondition):
+        return _eval_predicate(condition)
+    
+    def predicate(state: Dict[str, Any]) -> bool:
+        try:
+            return bool(expr(state))
+        except Exception as e:
+            print(f"Condition evaluation error: {e}")
+            return False
+    return predicate
+
+
+def _next_node_fn(
+    edge: Any,
+    conditions: Dict[str, Callable[[Dict[str, Any]], bool]]
+) -> Optional[Callable[[Dict[str, Any], bool], Optional[str]]]:
+    """
+    Turn an edge definition into a function of (state, stalled) returning the next node.
+    
+    Supports:
+    - Simple edges: "B"
+    - Conditional branches: {"condition": "state['x'] > 5", "true": "B", "false": "C"}
+    - Multiple conditions: {"state['x'] > 5": "B", "state['x'] <= 5": "C"}
+    """
+    # Simple edge (string)
+    if isinstance(edge, str):
+        return lambda state, stalled, target=edge: target
+    
+    # Conditional edge (dict)
+    if isinstance(edge, dict):
+        if "condition" in edge:
+            predicate = conditions[edge["condition"]]
+            on_true, on_false = edge.get("true"), edge.get("false")
+            return lambda state, stalled: (
+                on_true if not stalled and predicate(state) else on_false
+            )
+        
+        # Multiple conditions, first match wins
+        branches = [(conditions[key], next_node) for key, next_node in edge.items()]
+        
+        def first_match(state: Dict[str, Any], stalled: bool) -> Optional[str]:
+            if stalled:
+                return None  # No explicit exit branch; a stalled node ends the run
+            for predicate, next_node in branches:
+                if predicate(state):
+                    return next_node
+            return None
+        return first_match
+    
+    return None
+
+
+def _default_node_config(node_name: str) -> Node:
+    """Configuration for a node without an explicit entry in node_configs."""
+    return Node(
+        name=node_name,
+        type=NodeType.STANDARD,
+        tool=node_name
+    )
+
+
+def _dag_waves(graph: GraphDefinition) -> Optional[List[List[str]]]:
+    """
+    Group the nodes reachable from the start node into parallel waves.
+    
+    Returns None unless the reachable graph is static and acyclic: only
+    string or list edges, and no loop nodes. Every node in a wave has all
+    of its predecessors in earlier waves.
+    """
+    node_configs = graph.node_configs or {}
+    successors: Dict[str, List[str]] = {}
+    stack = [graph.start_node]
+    while stack:
+        node = stack.pop()
+        if node in successors:
+            continue
+        
+        node_config = node_configs.get(node)
+        if node_config and (node_config.type == NodeType.LOOP or node_config.loop_condition):
+            return None
+        
+        edge = graph.edges.get(node)
+        if edge is None:
+            targets = []
+        elif isinstance(edge, str):
+            targets = [edge]
+        elif isinstance(edge, list):
+            targets = [target for target in edge if target]
+        else:
+            return None  # Conditional edge
+        
+        successors[node] = targets
+        stack.extend(targets)
+    
+    indegree = {node: 0 for node in successors}
+    for targets in successors.values():
+        for target in targets:
+            indegree[target] += 1
+    
+    waves = []
+    ready = [node for node in successors if indegree[node] == 0]
+    scheduled = 0
+    while ready:
+        waves.append(ready)
+        scheduled += len(ready)
+        next_ready = []
+        for node in ready:
+            for target in successors[node]:
+                indegree[target] -= 1
+                if indegree[target] == 0:
+                    next_ready.append(target)
+        ready = next_ready
+    
+    # Nodes left unscheduled sit on a cycle
+    return waves if scheduled == len(successors) else None
+
+
+def compile_graph(graph: GraphDefinition) -> GraphDefinition:
+    """
+    Compile a graph into the lookup tables used during execution.
+    
+    Resolves node configurations, turns every loop and edge condition into
+    a predicate and every edge into a next-node function. Results are
+    stored on the graph so that execution never has to build default node
+    configs, parse condition source text or interpret edge definitions.
+    """
+    node_configs = graph.node_configs or {}
+    # Configured nodes may be missing from graph.nodes (e.g. edge targets)
+    graph._resolved_configs = {
+        name: node_configs.get(name) or _default_node_config(name)
+        for name in [*graph.nodes, *node_configs]
+    }
+    
+    sources = []
+    for node_config in node_configs.values():
+        if node_config.loop_condition:
+            sources.append(node_config.loop_condition)
+    for edge in graph.edges.values():
+        if isinstance(edge, dict):
+            if "condition" in edge:
+                sources.append(edge["condition"])
+            else:
+                sources.extend(edge.keys())
+    
+    graph._compiled_conditions = {src: compile_predicate(src) for src in sources}
+    graph._next_fns = {
+        name: next_fn
+        for name, edge in graph.edges.items()
+        if (next_fn := _next_node_fn(edge, graph._compiled_conditions)) is not None
+    }
+    
+    # Graphs with fan-out edges run on the wave scheduler in execute_dag
+    graph._dag_waves = None
+    if any(isinstance(edge, list) for edge in graph.edges.values()):
+        graph._dag_waves = _dag_waves(graph)
+        if graph._dag_waves is None:
+            raise ValueError(
+                "List (fan-out) edges are only supported in acyclic graphs "
+                "without conditional edges or loop nodes"
+            )
+    
+    return graph
+
+
+# Placeholder for state keys that are absent when a tool is memoized
+_MISSING = object()
+
+
+class _ToolCache:
+    """
+    Per-run memo of node results, keyed on the tool and its read values.
+    
+    Hashable read values are looked up directly; anything else is compared
+    with == against earlier entries for the same tool.
+    """
+    
+    def __init__(self):
+        self._hashed: Dict[tuple, tuple] = {}
+        self._unhashed: Dict[str, List[tuple]] = {}
+    
+    def get(self, tool_name: str, values: tuple) -> Optional[tuple]:
+        """Return the cached result for these read values, or None."""
+        try:
+            return self._hashed.get((tool_name, values))
+        except TypeError:
+            pass
+        
+        for cached_values, result in self._unhashed.get(tool_name, ()):
+            try:
+                if cached_values == values:
+                    return result
+            except Exception:
+                # e.g. element-wise comparisons with no single truth value
+                continue
+        return None
+    
+    def put(self, tool_name: str, values: tuple, result: tuple):
+        """Cache a result for these read values."""
+        try:
+            self._hashed[(tool_name, values)] = result
+        except TypeError:
+            self._unhashed.setdefault(tool_name, []).append((values, result))
+
+
 class WorkflowEngine:
     """Core workflow engine that executes graphs with nodes, edges, branching, and loops."""
     
@@ -19,7 +459,8 @@ class WorkflowEngine:
         self,
         graph: GraphDefinition,
         initial_state: Dict[str, Any],
-        run_id: str
+        run_id: str,
+        deep_log: bool = False
     ) -> tuple[Dict[str, Any], List[ExecutionLog]]:
         """
         Execute a workflow graph from start to finish.
@@ -28,59 +469,205 @@ class WorkflowEngine:
             graph: The graph definition with nodes and edges
             initial_state: Starting state dictionary
             run_id: Unique identifier for this run
+            deep_log: Detect changes by value and deep-copy them into the
+                log. Only needed for tools that mutate nested state values in
+                place; the default identity check suits tools that reassign keys.
             
         Returns:
             Tuple of (final_state, execution_log)
         """
-        state = copy.deepcopy(initial_state)
-        execution_log: List[ExecutionLog] = []
+        if graph._compiled_conditions is None:
+            compile_graph(graph)
+        
+        if graph._dag_waves is not None:
+            return await self.execute_dag(graph, initial_state, run_id, deep_log)
+        
+        state = dict(initial_state)
+        execution_log: List[ExecutionLog] = ExecutionLogList()
+        
+        # Results of nodes that declare their reads and writes
+        tool_cache = _ToolCache()
+        # Last loop_progress_key value seen per node, for stall detection
+        loop_progress: Dict[str, Any] = {}
+        
+        # Consecutive self-repeats per loop node, bounded by max_iterations
+        loop_repeats: Dict[str, int] = {}
         
         current_node = graph.start_node
-        visited_nodes = []
+        steps = 0
+        
+        # Run-wide bound for infinite loops, never below the original 100 steps
+        max_loop_iterations = max(
+            (config.max_iterations for config in graph._resolved_configs.values()),
+            default=0
+        )
+        max_steps = max(_MIN_MAX_STEPS, len(graph.nodes) * max_loop_iterations)
         
         while current_node:
             # Safety check for infinite loops
-            if len(visited_nodes) > 100:
+            if steps > max_steps:
                 state["_error"] = "Maximum iteration limit reached"
                 break
-            
-            visited_nodes.append(current_node)
+            steps += 1
             
             # Get node configuration
             node_config = self._get_node_config(graph, current_node)
             
-            # Execute the node
-            state_before = copy.deepcopy(state)
-            state, output = await self._execute_node(current_node, node_config, state)
+            # Execute the node, unless the same tool already ran on the same inputs
+            cache_key = self._tool_cache_key(current_node, node_config, state)
+            cached = tool_cache.get(*cache_key) if cache_key else None
+            if cached is not None:
+                # Replay everything the tool wrote, not just what changed
+                state_delta, removed_keys, output = cached
+                for key in removed_keys:
+                    state.pop(key, None)
+                state.update(state_delta)
+            else:
+                state_before = copy.deepcopy(state) if deep_log else dict(state)
+                state, output = await self._execute_node(current_node, node_config, state)
+                
+                # Log only what the node changed
+                state_delta, removed_keys = self._diff_state(state_before, state, deep_log)
+                if cache_key is not None and "_error" not in state_delta:
+                    written = {k: state[k] for k in node_config.writes if k in state}
+                    unset = [k for k in node_config.writes if k not in state]
+                    tool_cache.put(*cache_key, (written, unset, output))
             
-            # Log execution
             log_entry = ExecutionLog(
                 node=current_node,
-                timestamp=datetime.now().isoformat(),
-                state_before=state_before,
-                state_after=copy.deepcopy(state),
+                timestamp_ns=time.monotonic_ns(),
+                state_delta=state_delta,
+                removed_keys=removed_keys,
                 output=output
             )
             execution_log.append(log_entry)
             
             # Determine next node
             current_node = self._get_next_node(
-                graph, current_node, node_config, state
+                graph, current_node, node_config, state, loop_progress, loop_repeats
             )
         
         return state, execution_log
     
+    async def execute_dag(
+        self,
+        graph: GraphDefinition,
+        initial_state: Dict[str, Any],
+        run_id: str,
+        deep_log: bool = False
+    ) -> tuple[Dict[str, Any], List[ExecutionLog]]:
+        """
+        Execute an acyclic graph wave by wave, running each wave concurrently.
+        
+        Every node in a wave gets its own copy of the state. Their changes
+        are merged back in wave order once the whole wave has finished, so
+        a later node in the same wave wins on conflicting keys.
+        
+        Args:
+            graph: A graph whose waves were computed by compile_graph
+            initial_state: Starting state dictionary
+            run_id: Unique identifier for this run
+            deep_log: See execute_graph
+            
+        Returns:
+            Tuple of (final_state, execution_log)
+        """
+        if graph._compiled_conditions is None:
+            compile_graph(graph)
+        waves = graph._dag_waves or _dag_waves(graph)
+        if waves is None:
+            raise ValueError("Graph is not an acyclic graph of static edges")
+        
+        state = dict(initial_state)
+        execution_log: List[ExecutionLog] = ExecutionLogList()
+        
+        for wave_index, wave in enumerate(waves):
+            entries = await asyncio.gather(*(
+                self._execute_dag_node(graph, node, state, deep_log, wave_index)
+                for node in wave
+            ))
+            for log_entry in entries:
+                for key in log_entry.removed_keys:
+                    state.pop(key, None)
+                state.update(log_entry.state_delta)
+                execution_log.append(log_entry)
+        
+        return state, execution_log
+    
+    async def _execute_dag_node(
+        self,
+        graph: GraphDefinition,
+        node_name: str,
+        state: Dict[str, Any],
+        deep_log: bool,
+        wave_index: int
+    ) -> ExecutionLog:
+        """Run one node on a private copy of the state and log its changes."""
+        node_config = self._get_node_config(graph, node_name)
+        node_state = copy.deepcopy(state) if deep_log else dict(state)
+        node_state, output = await self._execute_node(node_name, node_config, node_state)
+        
+        state_delta, removed_keys = self._diff_state(state, node_state, deep_log)
+        return ExecutionLog(
+            node=node_name,
+            timestamp_ns=time.monotonic_ns(),
+            state_delta=state_delta,
+            removed_keys=removed_keys,
+            output=output,
+            wave=wave_index
+        )
+    
+    def _tool_cache_key(
+        self,
+        node_name: str,
+        node_config: Node,
+        state: Dict[str, Any]
+    ) -> Optional[tuple[str, tuple]]:
+        """
+        Key a node's result on its tool and the values of the keys it reads.
+        
+        Nodes that do not declare both reads and writes are never memoized,
+        since their tools may depend on or set anything in the state.
+        """
+        if node_config.reads is None or node_config.writes is None:
+            return None
+        
+        values = tuple(state.get(key, _MISSING) for key in node_config.reads)
+        return (node_config.tool or node_name, values)
+    
+    def _diff_state(
+        self,
+        before: Dict[str, Any],
+        after: Dict[str, Any],
+        deep: bool = False
+    ) -> tuple[Dict[str, Any], List[str]]:
+        """
+        Compute the keys a node added or changed, and the keys it removed.
+        
+        Tools return new objects for the keys they update, so an identity
+        check is enough unless deep comparison is requested.
+        """
+        if deep:
+            delta = {
+                k: copy.deepcopy(v) for k, v in after.items()
+                if k not in before or before[k] != v
+            }
+        else:
+            delta = {
+                k: v for k, v in after.items()
+                if k not in before or before[k] is not v
+            }
+        removed_keys = [k for k in before if k not in after]
+        return delta, removed_keys
+    
     def _get_node_config(self, graph: GraphDefinition, node_name: str) -> Node:
         """Get configuration for a specific node."""
-        if graph.node_configs and node_name in graph.node_configs:
-            return graph.node_configs[node_name]
-        
-        # Default configuration
-        return Node(
-            name=node_name,
-            type=NodeType.STANDARD,
-            tool=node_name
-        )
+        node_config = graph._resolved_configs.get(node_name)
+        if node_config is None:
+            # Unconfigured edge target missing from graph.nodes; resolve it once
+            node_config = (graph.node_configs or {}).get(node_name) or _default_node_config(node_name)
+            graph._resolved_configs[node_name] = node_config
+        return node_config
     
     async def _execute_node(
         self,
@@ -102,11 +689,11 @@ class WorkflowEngine:
         try:
             # Get the tool/function for this node
             tool_name = node_config.tool or node_name
-            tool_func = self.tool_registry.get(tool_name)
+            tool_func, is_async = self.tool_registry.get_with_kind(tool_name)
             
             # Execute the tool
             # Support both sync and async functions
-            if asyncio.iscoroutinefunction(tool_func):
+            if is_async:
                 result = await tool_func(state)
             else:
                 result = tool_func(state)
@@ -128,7 +715,9 @@ class WorkflowEngine:
         graph: GraphDefinition,
         current_node: str,
         node_config: Node,
-        state: Dict[str, Any]
+        state: Dict[str, Any],
+        loop_progress: Optional[Dict[str, Any]] = None,
+        loop_repeats: Optional[Dict[str, int]] = None
     ) -> Optional[str]:
         """
         Determine the next node to execute based on edges and conditions.
@@ -136,49 +725,66 @@ class WorkflowEngine:
         Supports:
         - Simple edges: {"A": "B"}
         - Conditional branches: {"A": {"condition": "state['x'] > 5", "true": "B", "false": "C"}}
-        - Loops: Node with loop_condition will repeat until condition is false
+        - Loops: Node with loop_condition will repeat until condition is false,
+          at most max_iterations times in a row
+        
+        A node with loop_progress_key is stalled when that state value has not
+        changed since the node's previous visit. A stalled node stops looping:
+        it does not repeat, a {"condition", "true", "false"} edge takes its
+        "false" branch and a multiple-conditions edge ends the workflow.
         """
+        stalled = self._is_stalled(current_node, node_config, state, loop_progress)
+        
         # Check for loop condition
         if node_config.type == NodeType.LOOP or node_config.loop_condition:
             iteration = state.get("iteration", 0)
+            repeats = loop_repeats.get(current_node, 0) if loop_repeats is not None else 0
             
             # Safety check
-            if iteration >= node_config.max_iterations:
+            if (iteration >= node_config.max_iterations
+                    or repeats + 1 >= node_config.max_iterations
+                    or stalled):
                 # Exit loop, continue to next node
                 pass
             elif node_config.loop_condition:
                 # Evaluate loop condition
-                if self._evaluate_condition(node_config.loop_condition, state):
+                if self._evaluate_condition(graph, node_config.loop_condition, state):
                     # Continue looping - stay on current node
+                    if loop_repeats is not None:
+                        loop_repeats[current_node] = repeats + 1
                     return current_node
-        
-        # Get edge from current node
-        if current_node not in graph.edges:
-            return None  # No more nodes
-        
-        edge = graph.edges[current_node]
-        
-        # Simple edge (string)
-        if isinstance(edge, str):
-            return edge
-        
-        # Conditional edge (dict)
-        if isinstance(edge, dict):
-            if "condition" in edge:
-                condition = edge["condition"]
-                if self._evaluate_condition(condition, state):
-                    return edge.get("true")
-                else:
-                    return edge.get("false")
             
-            # Multiple conditions
-            for key, next_node in edge.items():
-                if self._evaluate_condition(key, state):
-                    return next_node
+            # Leaving the loop; a later entry starts a fresh run of repeats
+            if loop_repeats is not None:
+                loop_repeats.pop(current_node, None)
         
-        return None
+        # Follow the edge as compiled by compile_graph
+        next_fn = graph._next_fns.get(current_node)
+        return next_fn(state, stalled) if next_fn else None
     
-    def _evaluate_condition(self, condition: str, state: Dict[str, Any]) -> bool:
+    def _is_stalled(
+        self,
+        node_name: str,
+        node_config: Node,
+        state: Dict[str, Any],
+        loop_progress: Optional[Dict[str, Any]]
+    ) -> bool:
+        """Record the node's progress value and report whether it is unchanged."""
+        key = node_config.loop_progress_key
+        if key is None or loop_progress is None:
+            return False
+        
+        value = state.get(key)
+        stalled = node_name in loop_progress and loop_progress[node_name] == value
+        loop_progress[node_name] = value
+        return stalled
+    
+    def _evaluate_condition(
+        self,
+        graph: GraphDefinition,
+        condition: str,
+        state: Dict[str, Any]
+    ) -> bool:
         """
         Safely evaluate a condition string.
         
@@ -186,30 +792,10 @@ class WorkflowEngine:
             "state['quality_score'] >= 70"
             "state.get('num_issues', 0) < 3"
         """
-        try:
-            # Create a safe evaluation context
-            context = {
-                'state': state,
-                '__builtins__': {}  # Restrict built-ins for safety
-            }
-            
-            # Allow safe operations
-            safe_builtins = {
-                'len': len,
-                'int': int,
-                'float': float,
-                'str': str,
-                'bool': bool,
-                'True': True,
-                'False': False,
-                'None': None
-            }
-            context.update(safe_builtins)
-            
-            return bool(eval(condition, context))
-        except Exception as e:
-            print(f"Condition evaluation error: {e}")
-            return False
+        predicate = graph._compiled_conditions.get(condition)
+        if predicate is None:
+            predicate = compile_predicate(condition)
+        return predicate(state)
 
 
 # Global engine instance
@@ -1,12 +1,13 @@
 from fastapi import FastAPI, HTTPException, BackgroundTasks
-from fastapi.responses import JSONResponse
-from typing import Dict, Any
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+from typing import Dict, Any, List
 
 from app.models import (
     GraphCreateRequest, GraphCreateResponse,
     GraphRunRequest, GraphRunResponse,
     StateResponse, ToolRegistration,
-    GraphDefinition
+    GraphDefinition, ExecutionLogEntry, expand_execution_log
 )
 from app.storage import storage
 from app.engine import workflow_engine
@@ -17,9 +18,23 @@ from app.workflows.code_review import get_code_review_workflow, EXAMPLE_INITIAL_
 app = FastAPI(
     title="Workflow Engine API",
     description="A minimal workflow/graph engine with nodes, edges, branching, and loops",
-    version="1.0.0"
+    version="1.0.0",
+    # orjson encodes large execution logs much faster than the stdlib json
+    default_response_class=ORJSONResponse
 )
 
+# Serialize whole logs and states in one call instead of validating
+# response models element by element
+_LOG_ADAPTER = TypeAdapter(List[ExecutionLogEntry])
+_STATE_ADAPTER = TypeAdapter(Dict[str, Any])
+
+
+def _dump_execution_log(initial_state: Dict[str, Any], execution_log: list) -> list:
+    """Expand a stored execution log and convert it to JSON-ready data."""
+    return _LOG_ADAPTER.dump_python(
+        expand_execution_log(initial_state, execution_log), mode="json"
+    )
+
 
 @app.get("/")
 async def root():
@@ -107,13 +122,16 @@ async def run_graph(request: GraphRunRequest):
         status = "completed" if "_error" not in final_state else "failed"
         storage.update_run(run_id, final_state, execution_log, status)
         
-        return GraphRunResponse(
-            run_id=run_id,
-            graph_id=request.graph_id,
-            final_state=final_state,
-            execution_log=execution_log,
-            status=status
-        )
+        # Shaped like GraphRunResponse; returned directly to skip response_model validation
+        return ORJSONResponse({
+            "run_id": run_id,
+            "graph_id": request.graph_id,
+            "final_state": _STATE_ADAPTER.dump_python(final_state, mode="json"),
+            "execution_log": _dump_execution_log(
+                request.initial_state, execution_log
+            ),
+            "status": status
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -127,14 +145,17 @@ async def get_run_state(run_id: str):
     if not run:
         raise HTTPException(status_code=404, detail="Run not found")
     
-    return StateResponse(
-        run_id=run["run_id"],
-        graph_id=run["graph_id"],
-        current_state=run["current_state"],
-        current_node=run.get("current_node"),
-        status=run["status"],
-        execution_log=run["execution_log"]
-    )
+    # Shaped like StateResponse; returned directly to skip response_model validation
+    return ORJSONResponse({
+        "run_id": run["run_id"],
+        "graph_id": run["graph_id"],
+        "current_state": _STATE_ADAPTER.dump_python(run["current_state"], mode="json"),
+        "current_node": run.get("current_node"),
+        "status": run["status"],
+        "execution_log": _dump_execution_log(
+            run["initial_state"], run["execution_log"]
+        )
+    })
 
 
 @app.get("/graphs")
@@ -150,7 +171,15 @@ async def list_graphs():
 @app.get("/runs")
 async def list_runs(graph_id: str = None):
     """List all workflow runs, optionally filtered by graph_id."""
-    runs = storage.list_runs(graph_id)
+    runs = [
+        {
+            **run,
+            "execution_log": _dump_execution_log(
+                run["initial_state"], run["execution_log"]
+            )
+        }
+        for run in storage.list_runs(graph_id)
+    ]
     return {
         "runs": runs,
         "count": len(runs)
@@ -1,6 +1,33 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, PrivateAttr
 from typing import Dict, Any, Optional, List, Callable
+from dataclasses import dataclass, field
+from datetime import datetime
 from enum import Enum
+import time
+
+
+@dataclass(slots=True, frozen=True)
+class ClockAnchor:
+    """Wall-clock time and time.monotonic_ns() read together when a run starts."""
+    wall: float
+    monotonic_ns: int
+    
+    @classmethod
+    def now(cls) -> "ClockAnchor":
+        return cls(time.time(), time.monotonic_ns())
+    
+    def to_iso(self, timestamp_ns: int) -> str:
+        """Convert a time.monotonic_ns() reading to an ISO 8601 wall-clock string."""
+        seconds = self.wall + (timestamp_ns - self.monotonic_ns) / 1e9
+        return datetime.fromtimestamp(seconds).isoformat()
+
+
+class ExecutionLogList(list):
+    """Execution log of one run, carrying the clock anchor taken when it started."""
+    
+    def __init__(self, clock_anchor: Optional[ClockAnchor] = None):
+        super().__init__()
+        self.clock_anchor = clock_anchor or ClockAnchor.now()
 
 
 class NodeType(str, Enum):
@@ -16,13 +43,22 @@ class Node(BaseModel):
     condition: Optional[str] = None  # For conditional nodes
     loop_condition: Optional[str] = None  # For loop nodes
     max_iterations: int = 10  # Safety limit for loops
+    loop_progress_key: Optional[str] = None  # Stop looping once this state value stops changing
+    reads: Optional[List[str]] = None  # State keys the tool depends on
+    writes: Optional[List[str]] = None  # State keys the tool sets; with reads, enables memoization
 
 
 class GraphDefinition(BaseModel):
     nodes: List[str]
-    edges: Dict[str, Any]  # Can be str or dict for conditional branching
+    edges: Dict[str, Any]  # str, list for fan-out, or dict for conditional branching
     start_node: str
     node_configs: Optional[Dict[str, Node]] = None
+    
+    # Execution caches, filled in by engine.compile_graph
+    _resolved_configs: Optional[Dict[str, Node]] = PrivateAttr(default=None)
+    _compiled_conditions: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+    _next_fns: Optional[Dict[str, Any]] = PrivateAttr(default=None)
+    _dag_waves: Optional[List[List[str]]] = PrivateAttr(default=None)
 
 
 class GraphCreateRequest(BaseModel):
@@ -42,7 +78,36 @@ class GraphRunRequest(BaseModel):
     initial_state: Dict[str, Any]
 
 
-class ExecutionLog(BaseModel):
+@dataclass(slots=True, frozen=True)
+class ExecutionLog:
+    """
+    Log of one node visit, storing only the state keys the node changed.
+    
+    Built by the engine from trusted data on every node visit, so it is a
+    plain dataclass rather than a validated model; the API returns the
+    expanded ExecutionLogEntry instead.
+    """
+    node: str
+    timestamp_ns: int  # time.monotonic_ns() when the node finished
+    state_delta: Dict[str, Any]
+    removed_keys: List[str] = field(default_factory=list)
+    output: Optional[Any] = None
+    wave: Optional[int] = None  # Wave index for nodes run by execute_dag
+    
+    def materialize(
+        self,
+        prior_state: Dict[str, Any]
+    ) -> tuple[Dict[str, Any], Dict[str, Any]]:
+        """Rebuild the (state_before, state_after) pair from the prior state."""
+        state_after = dict(prior_state)
+        for key in self.removed_keys:
+            state_after.pop(key, None)
+        state_after.update(self.state_delta)
+        return prior_state, state_after
+
+
+class ExecutionLogEntry(BaseModel):
+    """Expanded log entry with full state snapshots, as returned by the API."""
     node: str
     timestamp: str
     state_before: Dict[str, Any]
@@ -50,11 +115,50 @@ class ExecutionLog(BaseModel):
     output: Optional[Any] = None
 
 
+def expand_execution_log(
+    initial_state: Dict[str, Any],
+    execution_log: List[ExecutionLog]
+) -> List[ExecutionLogEntry]:
+    """
+    Replay state deltas once to produce full before/after snapshots.
+    
+    Nodes of the same execute_dag wave all ran on the state as it was when
+    the wave started, so each of them reports that state as state_before and
+    only its own changes in state_after.
+    
+    Entries are built with model_construct: every field comes from an
+    ExecutionLog the engine produced, so validation would be redundant.
+    """
+    # Plain lists (e.g. a run that has not finished yet) carry no anchor
+    clock_anchor = getattr(execution_log, "clock_anchor", None) or ClockAnchor.now()
+    
+    entries = []
+    state = initial_state
+    wave, wave_base = None, initial_state
+    for log in execution_log:
+        if log.wave is None:
+            state_before, state = log.materialize(state)
+            state_after = state
+        else:
+            if log.wave != wave:
+                wave, wave_base = log.wave, state
+            state_before, state_after = log.materialize(wave_base)
+            _, state = log.materialize(state)
+        entries.append(ExecutionLogEntry.model_construct(
+            node=log.node,
+            timestamp=clock_anchor.to_iso(log.timestamp_ns),
+            state_before=state_before,
+            state_after=state_after,
+            output=log.output
+        ))
+    return entries
+
+
 class GraphRunResponse(BaseModel):
     run_id: str
     graph_id: str
     final_state: Dict[str, Any]
-    execution_log: List[ExecutionLog]
+    execution_log: List[ExecutionLogEntry]
     status: str = "completed"
 
 
@@ -64,7 +168,7 @@ class StateResponse(BaseModel):
     current_state: Dict[str, Any]
     current_node: Optional[str] = None
     status: str
-    execution_log: List[ExecutionLog]
+    execution_log: List[ExecutionLogEntry]
 
 
 class ToolRegistration(BaseModel):
@@ -1,8 +1,11 @@
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, List
+from collections import defaultdict
 from datetime import datetime
+import threading
 import uuid
 
 from app.models import GraphDefinition, ExecutionLog
+from app.engine import compile_graph
 
 
 class InMemoryStorage:
@@ -11,11 +14,17 @@ class InMemoryStorage:
     def __init__(self):
         self.graphs: Dict[str, GraphDefinition] = {}
         self.runs: Dict[str, Dict[str, Any]] = {}
+        # Run IDs per graph, in creation order, so filtered listing avoids a scan
+        self._runs_by_graph: Dict[str, List[str]] = defaultdict(list)
+        # Guards writes against callers on other threads (e.g. sync endpoints)
+        self._lock = threading.Lock()
     
     def create_graph(self, graph: GraphDefinition) -> str:
         """Store a graph definition and return its ID."""
         graph_id = str(uuid.uuid4())
-        self.graphs[graph_id] = graph
+        compile_graph(graph)
+        with self._lock:
+            self.graphs[graph_id] = graph
         return graph_id
     
     def get_graph(self, graph_id: str) -> Optional[GraphDefinition]:
@@ -29,17 +38,20 @@ class InMemoryStorage:
     ) -> str:
         """Create a new workflow run."""
         run_id = str(uuid.uuid4())
-        self.runs[run_id] = {
+        run = {
             "run_id": run_id,
             "graph_id": graph_id,
             "initial_state": initial_state,
-            "current_state": initial_state.copy(),
+            "current_state": initial_state,  # Replaced, never mutated, by update_run
             "current_node": None,
             "status": "running",
             "execution_log": [],
             "created_at": datetime.now().isoformat(),
             "updated_at": datetime.now().isoformat()
         }
+        with self._lock:
+            self.runs[run_id] = run
+            self._runs_by_graph[graph_id].append(run_id)
         return run_id
     
     def update_run(
@@ -50,7 +62,9 @@ class InMemoryStorage:
         status: str = "completed"
     ):
         """Update a workflow run with results."""
-        if run_id in self.runs:
+        with self._lock:
+            if run_id not in self.runs:
+                return
             self.runs[run_id].update({
                 "current_state": final_state,
                 "status": status,
@@ -70,8 +84,8 @@ class InMemoryStorage:
         """List all runs, optionally filtered by graph_id."""
         if graph_id:
             return [
-                run for run in self.runs.values()
-                if run["graph_id"] == graph_id
+                self.runs[run_id]
+                for run_id in self._runs_by_graph.get(graph_id, ())
             ]
         return list(self.runs.values())
 
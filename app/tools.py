@@ -1,5 +1,7 @@
-from typing import Dict, Any, Callable
+from typing import Dict, Any, Callable, Iterator, NamedTuple, Optional
+from functools import lru_cache
 import ast
+import asyncio
 import re
 
 
@@ -7,15 +9,20 @@ class ToolRegistry:
     """Simple registry for tools (Python functions) that nodes can call."""
     
     def __init__(self):
-        self._tools: Dict[str, Callable] = {}
+        # name -> (function, is_async), classified once at registration
+        self._tools: Dict[str, tuple[Callable, bool]] = {}
         self._register_default_tools()
     
     def register(self, name: str, func: Callable):
         """Register a tool with a given name."""
-        self._tools[name] = func
+        self._tools[name] = (func, asyncio.iscoroutinefunction(func))
     
     def get(self, name: str) -> Callable:
         """Retrieve a tool by name."""
+        return self.get_with_kind(name)[0]
+    
+    def get_with_kind(self, name: str) -> tuple[Callable, bool]:
+        """Retrieve a tool by name along with whether it is async."""
         if name not in self._tools:
             raise ValueError(f"Tool '{name}' not found in registry")
         return self._tools[name]
@@ -31,18 +38,57 @@ class ToolRegistry:
         self.register("check_complexity", check_complexity)
         self.register("detect_issues", detect_issues)
         self.register("suggest_improvements", suggest_improvements)
+        self.register("detect_and_suggest", detect_and_suggest)
         self.register("calculate_quality_score", calculate_quality_score)
 
 
 # Default tool implementations for Code Review workflow
 
+class CodeMetrics(NamedTuple):
+    """Line-based metrics gathered in a single pass over the source."""
+    n_lines: int
+    n_for: int
+    n_while: int
+    n_if: int
+    n_elif: int
+
+
+@lru_cache(maxsize=128)
+def _parsed(code: str) -> Optional[ast.AST]:
+    """Parse code once per unique source string; None if it does not parse."""
+    try:
+        return ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+
+
+@lru_cache(maxsize=128)
+def _metrics(code: str) -> CodeMetrics:
+    """Count lines and loop/branch statements in one pass over the code."""
+    n_lines = n_for = n_while = n_if = n_elif = 0
+    for line in code.split('\n'):
+        n_lines += 1
+        stripped = line.lstrip()
+        if stripped.startswith('for '):
+            n_for += 1
+        elif stripped.startswith('while '):
+            n_while += 1
+        elif stripped.startswith('if '):
+            n_if += 1
+        elif stripped.startswith('elif '):
+            n_elif += 1
+    return CodeMetrics(n_lines, n_for, n_while, n_if, n_elif)
+
+
 def extract_functions(state: Dict[str, Any]) -> Dict[str, Any]:
     """Extract functions from code."""
     code = state.get("code", "")
     
     functions = []
-    try:
-        tree = ast.parse(code)
+    tree = _parsed(code)
+    if tree is None:
+        functions = [{"name": "parse_error", "line_start": 0, "num_args": 0}]
+    else:
         for node in ast.walk(tree):
             if isinstance(node, ast.FunctionDef):
                 functions.append({
@@ -50,26 +96,63 @@ def extract_functions(state: Dict[str, Any]) -> Dict[str, Any]:
                     "line_start": node.lineno,
                     "num_args": len(node.args.args)
                 })
-    except SyntaxError:
-        functions = [{"name": "parse_error", "line_start": 0, "num_args": 0}]
     
     state["functions"] = functions
     state["num_functions"] = len(functions)
     return state
 
 
+@lru_cache(maxsize=128)
+def _function_metrics(code: str) -> Dict[tuple, tuple]:
+    """Map (name, line_start) of each function to its (lines, loops, conditions)."""
+    tree = _parsed(code)
+    if tree is None:
+        return {}
+    
+    metrics = {}
+    for node in ast.walk(tree):
+        if isinstance(node, ast.FunctionDef):
+            loops = conditions = 0
+            for child in ast.walk(node):
+                if isinstance(child, (ast.For, ast.While)):
+                    loops += 1
+                elif isinstance(child, ast.If):
+                    conditions += 1
+            lines = node.end_lineno - node.lineno + 1
+            metrics[(node.name, node.lineno)] = (lines, loops, conditions)
+    return metrics
+
+
+@lru_cache(maxsize=128)
+def _missing_docstrings(code: str) -> tuple[str, ...]:
+    """Names of functions without a docstring, in AST walk order."""
+    tree = _parsed(code)
+    if tree is None:
+        return ()
+    return tuple(
+        node.name for node in ast.walk(tree)
+        if isinstance(node, ast.FunctionDef) and not ast.get_docstring(node)
+    )
+
+
 def check_complexity(state: Dict[str, Any]) -> Dict[str, Any]:
     """Check code complexity (simplified)."""
     code = state.get("code", "")
     functions = state.get("functions", [])
     
-    # Simple complexity metrics
+    # Simple complexity metrics, per function where the code parses
+    function_metrics = _function_metrics(code)
+    file_metrics = _metrics(code)
     complexity_scores = []
     for func in functions:
         # Count lines, loops, conditions as a simple metric
-        lines = len(code.split('\n'))
-        loops = code.count('for ') + code.count('while ')
-        conditions = code.count('if ') + code.count('elif ')
+        key = (func.get("name"), func.get("line_start"))
+        if key in function_metrics:
+            lines, loops, conditions = function_metrics[key]
+        else:
+            lines = file_metrics.n_lines
+            loops = file_metrics.n_for + file_metrics.n_while
+            conditions = file_metrics.n_if + file_metrics.n_elif
         
         score = (lines * 0.1) + (loops * 2) + (conditions * 1.5)
         complexity_scores.append({
@@ -82,31 +165,42 @@ def check_complexity(state: Dict[str, Any]) -> Dict[str, Any]:
     return state
 
 
-def detect_issues(state: Dict[str, Any]) -> Dict[str, Any]:
-    """Detect basic code issues."""
+def _iter_issues(state: Dict[str, Any]) -> Iterator[Dict[str, str]]:
+    """Yield basic code issues one at a time."""
     code = state.get("code", "")
     
-    issues = []
-    
     # Check for common issues
     if "print(" in code:
-        issues.append({"type": "debug_code", "message": "Found print statements"})
+        yield {"type": "debug_code", "message": "Found print statements"}
     
-    if len(code.split('\n')) > 100:
-        issues.append({"type": "long_file", "message": "File is too long"})
+    if _metrics(code).n_lines > 100:
+        yield {"type": "long_file", "message": "File is too long"}
     
     # Check for missing docstrings
-    try:
-        tree = ast.parse(code)
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                if not ast.get_docstring(node):
-                    issues.append({
-                        "type": "missing_docstring",
-                        "message": f"Function '{node.name}' missing docstring"
-                    })
-    except:
-        pass
+    for name in _missing_docstrings(code):
+        yield {
+            "type": "missing_docstring",
+            "message": f"Function '{name}' missing docstring"
+        }
+
+
+def _suggestion_for(issue: Dict[str, str]) -> Optional[str]:
+    """Map a detected issue to an improvement suggestion, if there is one."""
+    if issue["type"] == "debug_code":
+        return "Remove debug print statements before production"
+    elif issue["type"] == "missing_docstring":
+        return f"Add docstring: {issue['message']}"
+    elif issue["type"] == "long_file":
+        return "Consider splitting file into smaller modules"
+    return None
+
+
+_COMPLEXITY_SUGGESTION = "Consider refactoring complex functions"
+
+
+def detect_issues(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Detect basic code issues."""
+    issues = list(_iter_issues(state))
     
     state["issues"] = issues
     state["num_issues"] = len(issues)
@@ -121,21 +215,41 @@ def suggest_improvements(state: Dict[str, Any]) -> Dict[str, Any]:
     suggestions = []
     
     for issue in issues:
-        if issue["type"] == "debug_code":
-            suggestions.append("Remove debug print statements before production")
-        elif issue["type"] == "missing_docstring":
-            suggestions.append(f"Add docstring: {issue['message']}")
-        elif issue["type"] == "long_file":
-            suggestions.append("Consider splitting file into smaller modules")
+        suggestion = _suggestion_for(issue)
+        if suggestion:
+            suggestions.append(suggestion)
     
     if complexity > 10:
-        suggestions.append("Consider refactoring complex functions")
+        suggestions.append(_COMPLEXITY_SUGGESTION)
     
     state["suggestions"] = suggestions
     state["num_suggestions"] = len(suggestions)
     return state
 
 
+def detect_and_suggest(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Detect issues and suggest improvements for them in a single pass."""
+    complexity = state.get("avg_complexity", 0)
+    
+    issues = []
+    suggestions = []
+    
+    for issue in _iter_issues(state):
+        issues.append(issue)
+        suggestion = _suggestion_for(issue)
+        if suggestion:
+            suggestions.append(suggestion)
+    
+    if complexity > 10:
+        suggestions.append(_COMPLEXITY_SUGGESTION)
+    
+    state["issues"] = issues
+    state["num_issues"] = len(issues)
+    state["suggestions"] = suggestions
+    state["num_suggestions"] = len(suggestions)
+    return state
+
+
 def calculate_quality_score(state: Dict[str, Any]) -> Dict[str, Any]:
     """Calculate overall quality score."""
     num_issues = state.get("num_issues", 0)
@@ -8,10 +8,9 @@ def get_code_review_workflow() -> GraphDefinition:
     Steps:
     1. Extract functions from code
     2. Check complexity metrics
-    3. Detect basic issues
-    4. Suggest improvements
-    5. Calculate quality score
-    6. Loop back to improve if quality_score < threshold
+    3. Detect basic issues and suggest improvements (one fused step)
+    4. Calculate quality score
+    5. Loop back to improve if quality_score < threshold
     """
     
     # Define nodes with configurations
@@ -26,21 +25,21 @@ def get_code_review_workflow() -> GraphDefinition:
             type=NodeType.STANDARD,
             tool="check_complexity"
         ),
-        "detect": Node(
-            name="detect",
+        "detect_improve": Node(
+            name="detect_improve",
             type=NodeType.STANDARD,
-            tool="detect_issues"
-        ),
-        "improve": Node(
-            name="improve",
-            type=NodeType.STANDARD,
-            tool="suggest_improvements"
+            tool="detect_and_suggest",
+            reads=["code", "avg_complexity"],
+            writes=["issues", "num_issues", "suggestions", "num_suggestions"]
         ),
         "score": Node(
             name="score",
             type=NodeType.LOOP,
             tool="calculate_quality_score",
+            reads=["num_issues", "avg_complexity", "num_functions", "iteration"],
+            writes=["quality_score", "iteration"],
             loop_condition="state.get('quality_score', 0) < 70 and state.get('iteration', 0) < 3",
+            loop_progress_key="quality_score",
             max_iterations=3
         )
     }
@@ -48,18 +47,17 @@ def get_code_review_workflow() -> GraphDefinition:
     # Define edges with conditional branching
     edges = {
         "extract": "analyze",
-        "analyze": "detect",
-        "detect": "improve",
-        "improve": "score",
+        "analyze": "detect_improve",
+        "detect_improve": "score",
         "score": {
             "condition": "state.get('quality_score', 0) < 70 and state.get('iteration', 0) < 3",
-            "true": "improve",  # Loop back to improve
+            "true": "detect_improve",  # Loop back to improve
             "false": None  # Exit workflow
         }
     }
     
     return GraphDefinition(
-        nodes=["extract", "analyze", "detect", "improve", "score"],
+        nodes=["extract", "analyze", "detect_improve", "score"],
         edges=edges,
         start_node="extract",
         node_configs=node_configs